@@ -1,12 +1,15 @@
+import io
+import ast
+import os
+import csv
+import hashlib
+import itertools
+from string import Template
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import streamlit as st
-import docling
-import pandas as pd
-from PIL import Image
 from schema import Profile
 from config import settings
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_docling import DoclingLoader
-from langchain_docling.loader import ExportType
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,8 +18,13 @@ load_dotenv()
 from pathlib import Path
 
 
+# Heavy libraries (PyMuPDF, python-docx, pandas, LangChain, PIL) are imported
+# where they are used to keep cold starts light
 icon_path = Path(__file__).parent / "logo.png"
-icon = Image.open(icon_path)
+icon = None
+if icon_path.exists():
+    from PIL import Image
+    icon = Image.open(icon_path)
 
 # icon = Image.open("logo.png")
 
@@ -56,6 +64,256 @@ st.markdown("""
 
 
 
+# HTML for the result cards is built once at import; each render only fills in values
+_CARD_TMPL = Template("""
+<div class="box">
+<div class="title">$title</div>
+$body
+</div>
+""")
+_FIELD_TMPL = Template("<p><b>$label:</b> $value</p>")
+_TAG_SPAN = "<span style='background:#e0e7ff;padding:6px 12px;margin:4px;border-radius:8px;display:inline-block;'>{}</span>"
+
+_FIELD_CARDS = {
+    "personal": ("👤 Personal Details", [
+        ("Name", "fullname"),
+        ("Email", "email_id"),
+        ("Phone", "phone_number"),
+        ("Designation", "designation"),
+        ("Current Location", "current_location"),
+    ]),
+    "working": ("👩🏻‍💻 Working Details", [
+        ("Year of Experience", "year_of_experience"),
+        ("Current CTC", "current_ctc"),
+        ("Current Company", "current_company"),
+        ("Expected CTC", "expected_ctc"),
+    ]),
+    "links": ("🌐 Links", [
+        ("LinkedIn URL", "linkedin_url"),
+        ("GitHub URL", "github_url"),
+    ]),
+    "certifications": ("📄 Certifications", [("Certifications", "certifications")]),
+    "summary": ("📃 Summary", [("Summary", "summary")]),
+    "portfolio": ("👩‍💻 Portfolio ", [("Portfolio Project URL", "portfolio_project_urls")]),
+}
+
+
+def render_tag_list(tags):
+    return (_TAG_SPAN * len(tags)).format(*tags)
+
+
+def render_field_card(data, name):
+    title, fields = _FIELD_CARDS[name]
+    body = "".join(
+        _FIELD_TMPL.substitute(label = label, value = data.get(key))
+        for label, key in fields
+    )
+    return _CARD_TMPL.substitute(title = title, body = body)
+
+
+def render_tag_card(title, tags):
+    return _CARD_TMPL.substitute(title = title, body = render_tag_list(tags))
+
+
+def render_resume_cards(data):
+    tech = (data.get("technical_skills") or [{}])[0]
+    return [
+        render_field_card(data, "personal"),
+        _CARD_TMPL.substitute(
+            title = "💻 Technical Skills",
+            body = render_tag_card("💻 Programming Languages", tech.get("programming_languages") or []),
+        ),
+        render_tag_card("💻 Libraries or Frameworks", tech.get("libraries_or_frameworks") or []),
+        render_tag_card("💻 Other Tools", tech.get("other_tools") or []),
+        render_tag_card("💻 Interpersonal Skills", data.get("interpersonal_skills") or []),
+        render_field_card(data, "working"),
+        render_field_card(data, "links"),
+        render_field_card(data, "certifications"),
+        render_field_card(data, "summary"),
+        render_field_card(data, "portfolio"),
+    ]
+
+
+@st.cache_resource
+def _get_llm():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model = "gemini-2.5-flash-lite",
+        temperature = 0,
+        google_api_key = settings.google_api_key,
+    )
+
+
+# with_structured_output walks the Pydantic model to build the tool spec, so
+# bind each schema only once per process. This has to be a Streamlit cache:
+# the script is re-executed on every rerun, which would reset an lru_cache.
+# The class itself is left unhashed and the cache is keyed on its name.
+@st.cache_resource
+def _structured(schema_name, _schema_cls):
+    return _get_llm().with_structured_output(
+        schema = _schema_cls
+    )
+
+
+def get_structured_llm():
+    return _structured(Profile.__qualname__, Profile)
+
+
+# Keyed on the resume text hash only; persisted to disk so re-uploads of the
+# same resume skip the Gemini round-trip even after a server restart.
+@st.cache_data(show_spinner = False, persist = "disk")
+def extract_profile(text_hash, _resume_text):
+    response = get_structured_llm().invoke(_resume_text)
+    if response is None:
+        raise ValueError("Gemini returned no structured profile for this resume")
+    return response.model_dump()
+
+
+def iter_resume_pages(file_bytes, suffix):
+    # Both parsers read straight from the uploaded bytes, no temp file needed.
+    # PDFs are yielded page by page so callers can stop once they have enough.
+    if suffix == ".pdf":
+        import fitz
+
+        with fitz.open(stream = file_bytes, filetype = "pdf") as doc:
+            for page in doc:
+                yield page.get_text("text")
+        return
+
+    import docx
+    from docx.table import Table
+
+    # DOCX has no page boundaries, so the whole document is one chunk. Walk
+    # paragraphs and tables in document order so table-based layouts keep
+    # their reading order.
+    document = docx.Document(io.BytesIO(file_bytes))
+    parts = []
+    for block in document.iter_inner_content():
+        if isinstance(block, Table):
+            for row in block.rows:
+                parts.append(" | ".join(cell.text for cell in row.cells))
+        elif block.text.strip():
+            parts.append(block.text)
+    yield "\n\n".join(parts)
+
+
+def read_resume_text(file_bytes, suffix):
+    # Cap the text sent to Gemini at MAX_PAGES pages and MAX_RESUME_CHARS
+    # characters; the character budget is what bounds DOCX, which has no pages.
+    # Also reports whether anything was cut off.
+    pages = list(itertools.islice(iter_resume_pages(file_bytes, suffix), MAX_PAGES + 1))
+    truncated = len(pages) > MAX_PAGES
+    text = "\n\n".join(pages[:MAX_PAGES])
+    if len(text) > MAX_RESUME_CHARS:
+        text = text[:MAX_RESUME_CHARS]
+        truncated = True
+    return text, truncated
+
+
+def safe_eval_list(x):
+    if not isinstance(x, str) or not x:
+        return []
+    try:
+        val = ast.literal_eval(x)
+    except Exception:
+        return []
+    return val if isinstance(val, list) else []
+
+
+def read_db(csv_file):
+    # Decode the skills column once at load time so the filter below works on
+    # real Python lists instead of their string form
+    import pandas as pd
+
+    return pd.read_csv(
+        csv_file,
+        converters = {col: safe_eval_list for col in LIST_COLUMNS},
+    )
+
+
+# mtime is part of the cache key, so the file is only parsed again after a save
+@st.cache_data(show_spinner = False)
+def load_db(csv_file, mtime):
+    df = read_db(csv_file)
+    # Inverted index of skill -> row positions, so filtering is a set
+    # intersection instead of a scan over every row
+    skill_index = defaultdict(set)
+    for i, skills in enumerate(df["skills"]):
+        for skill in skills:
+            skill_index[skill].add(i)
+    return df, dict(skill_index), sorted(skill_index)
+
+
+# Emails already in the database plus the file mtime they were read at. The
+# app's own saves update both, so a save never has to scan the CSV; the set is
+# only re-read when the file changes outside the app (git pull, hand edit,
+# another server process).
+@st.cache_resource
+def _email_index_state(csv_file):
+    return {"mtime": None, "emails": set()}
+
+
+def _csv_mtime(csv_file):
+    return os.path.getmtime(csv_file) if os.path.exists(csv_file) else None
+
+
+def load_email_index(csv_file):
+    state = _email_index_state(csv_file)
+    mtime = _csv_mtime(csv_file)
+    if state["mtime"] != mtime:
+        emails = set()
+        if mtime is not None:
+            with open(csv_file, newline = "", encoding = "utf-8") as f:
+                emails = {row["email_id"] for row in csv.DictReader(f)}
+        state["emails"] = emails
+        state["mtime"] = mtime
+    return state["emails"]
+
+
+def _record_write(csv_file, email):
+    state = _email_index_state(csv_file)
+    state["emails"].add(email)
+    state["mtime"] = _csv_mtime(csv_file)
+
+
+def append_row(csv_file, data):
+    write_header = not os.path.exists(csv_file)
+    with open(csv_file, "a", newline = "", encoding = "utf-8") as f:
+        writer = csv.DictWriter(
+            f,
+            fieldnames = DB_COLUMNS,
+            extrasaction = "ignore",
+            lineterminator = "\n",
+        )
+        if write_header:
+            writer.writeheader()
+        writer.writerow(data)
+    _record_write(csv_file, data["email_id"])
+
+
+def overwrite_row(csv_file, email, data):
+    # Stream rows into a temp file, dropping the old entry for this email,
+    # then swap it in place of the original file
+    tmp_file = f"{csv_file}.tmp"
+    with open(csv_file, newline = "", encoding = "utf-8") as src, \
+            open(tmp_file, "w", newline = "", encoding = "utf-8") as dst:
+        reader = csv.DictReader(src)
+        writer = csv.DictWriter(
+            dst,
+            fieldnames = reader.fieldnames,
+            extrasaction = "ignore",
+            lineterminator = "\n",
+        )
+        writer.writeheader()
+        for row in reader:
+            if row["email_id"] != email:
+                writer.writerow(row)
+        writer.writerow(data)
+    os.replace(tmp_file, csv_file)
+    _record_write(csv_file, email)
+
+
 @st.dialog("Duplicate Email Found")
 def show_overwrite_dialog(email, data, csv_file):
     st.write(f"An entry with email **{email}** already exists in the database.")
@@ -64,21 +322,66 @@ def show_overwrite_dialog(email, data, csv_file):
     col1, col2 = st.columns(2)
     with col1:
         if st.button("Overwrite Existing"):
-            df = pd.read_csv(csv_file)
-            df = df[df["email_id"] != email]  # remove old
-            df_new = pd.DataFrame([data])
-            df = pd.concat([df, df_new], ignore_index=True)
-            df.to_csv(csv_file, index = False)
+            overwrite_row(csv_file, email, data)
             st.success(f"Your resume for {email} has been overwritten successfully!")
             st.rerun()
 
     with col2:
         if st.button("Cancel"):
-            # df_new = pd.DataFrame([data])  
-            df = pd.read_csv(csv_file)
             st.warning("The current process has been cancelled.")
             st.rerun()
                 
+# Fragments rerun on their own widget events, so clicking Save or changing the
+# skill filter does not re-execute the rest of the script
+@st.fragment
+def _show_and_save(data, idx):
+    for card in render_resume_cards(data):
+        st.markdown(card, unsafe_allow_html=True)
+
+    if st.button("Save", key = f"save_{idx}"):
+        tech = data.get("technical_skills", [])
+        if isinstance(tech, list) and len(tech) > 0:
+            tech = tech[0]  # take first dict from list
+        else:
+            tech = {}
+
+        prog_langs = tech.get("programming_languages", []) or []
+        frameworks = tech.get("libraries_or_frameworks", []) or []
+        tools = tech.get("other_tools", []) or []
+
+        data["skills"] = list(set(prog_langs + frameworks + tools))
+
+        # csv_file = "resume_output.csv"
+
+        # Check if email exists
+        if data['email_id'] in load_email_index(csv_file):
+            # Trigger the dialog box
+            show_overwrite_dialog(data['email_id'], data, csv_file)
+        else:
+            append_row(csv_file, data)
+            st.success("📄Resume data successfully saved")
+            st.rerun()
+
+
+@st.fragment
+def _filter_panel():
+    df, skill_index, all_skill_details = load_db(csv_file, os.path.getmtime(csv_file))
+
+    st.title("🔍Skills Filtering ")
+
+    selected_skills = st.multiselect("Select one or more skills", all_skill_details)
+
+    if not selected_skills:
+        filtered_df = df
+
+    else:
+        keep = set.intersection(*(skill_index[skill] for skill in selected_skills))
+        filtered_df = df.iloc[sorted(keep)]
+        # filtered_df = df[df['skills'].apply(lambda skill_set: bool(set(skill_set) & set(selected_skills)))]
+
+    st.dataframe(filtered_df)
+
+
 tab1, tab2 = st.tabs(
     [
         "📃Resume Upload", 
@@ -88,210 +391,99 @@ tab1, tab2 = st.tabs(
 )
 
 csv_file = "final/resume_output.csv"
+# Only skills is decoded: the other list-like columns are display-only and
+# their cell shapes vary between rows, which Arrow cannot serialize
+LIST_COLUMNS = ["skills"]
+DB_COLUMNS = [*Profile.model_fields, "skills"]
+MAX_LLM_WORKERS = 8
+MIN_RESUME_CHARS = 200
+MAX_PAGES = 10
+MAX_RESUME_CHARS = 30000
 
 with tab1:
     st.header("Upload Resume")
-    uploaded_file = st.file_uploader(
+    uploaded_files = st.file_uploader(
         "Choose a file",
-        type = ["pdf", "docx"]
+        type = ["pdf", "docx"],
+        accept_multiple_files = True,
     )
-    if uploaded_file:
+    if uploaded_files:
         st.success("📄Resume Uploaded")
 
         if st.button("Convert"):
             with st.spinner("Extracting Information..."):
-                temp_path = f"temp_{uploaded_file.name}"
-                with open(temp_path, "wb") as f:
-                    f.write(uploaded_file.read())
-                
-                
-                # loader = DoclingLoader(file_path=temp_path, export_type=ExportType.MARKDOWN)
-                loader = DoclingLoader(
-                    file_path=temp_path,
-                 
-                    export_type=ExportType.MARKDOWN
-                )
-
-                docs = loader.load()
-                resume_text = docs[0].page_content
-               
-
-
-            with st.spinner("Generating Insights..."):
-                llm = ChatGoogleGenerativeAI(
-                    model = "gemini-2.5-flash-lite",
-                    temperature = 0,
-                    google_api_key = settings.google_api_key,
-                )
-
-                structured_llm = llm.with_structured_output(
-                    schema = Profile
-                )
-                response = structured_llm.invoke(
-                    resume_text
-                )
+                # An unreadable upload only drops its own file, not the whole batch
+                resume_texts = []
+                for uploaded_file in uploaded_files:
+                    try:
+                        resume_text, truncated = read_resume_text(
+                            uploaded_file.getvalue(),
+                            Path(uploaded_file.name).suffix.lower(),
+                        )
+                    except Exception as e:
+                        st.error(f"Could not read {uploaded_file.name}: {e}")
+                        continue
+                    if truncated:
+                        st.warning(
+                            f"{uploaded_file.name} is longer than {MAX_PAGES} pages or "
+                            f"{MAX_RESUME_CHARS} characters; only the beginning will be used."
+                        )
+                    resume_texts.append((uploaded_file.name, resume_text))
+
+            # Near-empty text (scanned images, blank templates) cannot yield a
+            # profile, so skip the Gemini call for it
+            pending = []
+            for name, resume_text in resume_texts:
+                if len(resume_text.strip()) < MIN_RESUME_CHARS:
+                    st.error(f"Not enough text found in {name} to extract information.")
+                else:
+                    pending.append((name, resume_text))
+
+            # Gemini calls are I/O bound, so run them side by side and keep
+            # the results in upload order
+            results = [None] * len(pending)
+            if pending:
+                with st.status("Generating Insights...") as status:
+                    with ThreadPoolExecutor(max_workers = MAX_LLM_WORKERS) as executor:
+                        futures = {
+                            executor.submit(
+                                extract_profile,
+                                hashlib.sha256(resume_text.encode("utf-8")).hexdigest(),
+                                resume_text,
+                            ): i
+                            for i, (_, resume_text) in enumerate(pending)
+                        }
+                        # A failed call only drops its own file, not the whole batch
+                        failed = []
+                        for future in as_completed(futures):
+                            i = futures[future]
+                            try:
+                                results[i] = future.result()
+                            except Exception as e:
+                                failed.append(pending[i][0])
+                                status.write(f"❌ {pending[i][0]}: {e}")
+                            else:
+                                status.write(f"✅ {pending[i][0]}")
+                    if failed:
+                        status.update(label = "Some resumes could not be processed", state = "error")
+                    else:
+                        status.update(label = "Insights Generated", state = "complete")
+                for name in failed:
+                    st.error(f"Could not extract information from {name}.")
 
             # st.json(response.model_dump_json(indent = 5 ))
 
-            data = response.model_dump()
-
-            st.markdown(f"""
-            <div class="box">
-                <div class="title">👤 Personal Details</div>
-                <p><b>Name:</b> {data.get('fullname')}</p>
-                <p><b>Email:</b> {data.get('email_id')}</p>
-                <p><b>Phone:</b> {data.get('phone_number')}</p>
-                <p><b>Designation:</b> {data.get('designation')}</p>
-                <p><b>Current Location:</b> {data.get('current_location')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown(f"""               
-            <div class="box">
-                <div class="title">💻 Technical Skills</div>
-                    
-            <div class="box">
-                <div class="title">💻 Programming Languages</div>
-                    {"".join([f"<span style='background:#e0e7ff;padding:6px 12px;margin:4px;border-radius:8px;display:inline-block;'>{lang}</span>"
-                    for lang in data["technical_skills"][0]["programming_languages"]])}
-                </div>
-                
-                 """, 
-                unsafe_allow_html=True)
-            st.markdown(f"""     
-            <div class="box">
-                <div class="title">💻 Libraries or Frameworks</div>
-                    {"".join([f"<span style='background:#e0e7ff;padding:6px 12px;margin:4px;border-radius:8px;display:inline-block;'>{lang}</span>"
-                    for lang in data["technical_skills"][0]["libraries_or_frameworks"]])}
-            </div>
-                """, 
-                unsafe_allow_html=True)
-            
-            st.markdown(f"""
-            <div class="box">
-                <div class="title">💻 Other Tools</div>
-                    {"".join([f"<span style='background:#e0e7ff;padding:6px 12px;margin:4px;border-radius:8px;display:inline-block;'>{lang}</span>"
-                    for lang in data["technical_skills"][0]["other_tools"]])}
-            </div>
-            
-             """, 
-                unsafe_allow_html=True)
-            st.markdown(f"""
-            <div class="box">
-                <div class="title">💻 Interpersonal Skills</div>
-                    {"".join([f"<span style='background:#e0e7ff;padding:6px 12px;margin:4px;border-radius:8px;display:inline-block;'>{lang}</span>"
-                    for lang in data["interpersonal_skills"]])}
-                
-            </div>
-                """, 
-                unsafe_allow_html=True)
-            
-            
-            st.markdown(f"""
-            <div class="box">
-                <div class="title">👩🏻‍💻 Working Details</div>
-                <p><b>Year of Experience:</b> {data.get('year_of_experience')}</p>
-                <p><b>Current CTC:</b> {data.get('current_ctc')}</p>
-                <p><b>Current Company:</b> {data.get('current_company')}</p>
-                <p><b>Expected CTC:</b> {data.get('expected_ctc')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            st.markdown(f"""
-            <div class="box">
-                <div class="title">🌐 Links</div>
-                <p><b>LinkedIn URL:</b> {data.get('linkedin_url')}</p>
-                <p><b>GitHub URL:</b> {data.get('github_url')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown(f"""
-            <div class="box">
-                <div class="title">📄 Certifications</div>
-                <p><b>Certifications:</b> {data.get('certifications')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown(f"""
-            <div class="box">
-                <div class="title">📃 Summary</div>
-                <p><b>Summary:</b> {data.get('summary')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-  
-            st.markdown(f"""
-            <div class="box">
-                <div class="title">👩‍💻 Portfolio </div>
-                <p><b>Portfolio Project URL:</b> {data.get('portfolio_project_url')}</p>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            
-            st.session_state["resume_data"] = data
-            os.remove(temp_path)
+            st.session_state["resume_data"] = [data for data in results if data is not None]
 
     if "resume_data" in st.session_state:
-        if st.button("Save"):
-            data = st.session_state["resume_data"]
-            
-            tech = data.get("technical_skills", [])
-            if isinstance(tech, list) and len(tech) > 0:
-                tech = tech[0]  # take first dict from list
-            else:
-                tech = {}
-
-            prog_langs = tech.get("programming_languages", []) or []
-            frameworks = tech.get("libraries_or_frameworks", []) or []
-            tools = tech.get("other_tools", []) or []
-
-            data["skills"] = list(set(prog_langs + frameworks + tools))
-                        
-            df_new = pd.DataFrame([data])
-            # csv_file = "resume_output.csv"
-            
-            if os.path.exists(csv_file):
-                df = pd.read_csv(csv_file)
-
-                # Check if email exists
-                if not df[df['email_id'] == data['email_id']].empty:
-                    # Trigger the dialog box
-                    show_overwrite_dialog(data['email_id'], data, csv_file)
-                else:
-                    df_new.to_csv(csv_file, mode = 'a', header = False, index = False)
-                    st.success("📄Resume data successfully saved")
-                    st.rerun()
-            # else:
-            #     df_new.to_csv(csv_file, index = False)
-            #     st.success("📄Resume data successfully saved")
-
+        for i, data in enumerate(st.session_state["resume_data"]):
+            if i:
+                st.divider()
+            _show_and_save(data, i)
 
 
 with tab2:
-    data = pd.read_csv(csv_file)
-
-    df = pd.DataFrame(data)
-
-    st.title("🔍Skills Filtering ")
-
-    # skill_details = df['skills'].unique().tolist()
-    skill_data = df["skills"].apply(lambda x: eval(x) if isinstance(x, str) else x)
-    skill_list = []
-    for skills in skill_data:
-        for skill in skills:
-            skill_list.append(skill)
-            
-    all_skill_details = sorted(set(skill_list))
-
-    selected_skills = st.multiselect("Select one or more skills", all_skill_details)
-
-    if not selected_skills:
-        filtered_df = df
-        
-    else:
-        filtered_df = df[df['skills'].apply(lambda skill_set: all(skill in skill_set for skill in selected_skills))]
-        # filtered_df = df[df['skills'].apply(lambda skill_set: bool(set(skill_set) & set(selected_skills)))]
-
-    st.dataframe(filtered_df)
+    _filter_panel()
 
 
 # with tab3:    
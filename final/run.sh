@@ -0,0 +1,24 @@
+#!/usr/bin/env sh
+# Start the app from the repo root, which the relative paths in main_pro.py expect.
+# jemalloc is preloaded when installed: pandas/Arrow buffers and LLM JSON parsing
+# create many short-lived allocations that fragment glibc malloc over long sessions.
+set -e
+cd "$(dirname "$0")/.."
+
+for lib in \
+    /usr/lib/x86_64-linux-gnu/libjemalloc.so.2 \
+    /usr/lib/aarch64-linux-gnu/libjemalloc.so.2 \
+    /usr/lib/libjemalloc.so.2
+do
+    if [ -f "$lib" ]; then
+        export LD_PRELOAD="${LD_PRELOAD:+$LD_PRELOAD:}$lib"
+        break
+    fi
+done
+
+# Arrow-managed buffers (st.dataframe serialization) use jemalloc as well
+export ARROW_DEFAULT_MEMORY_POOL="${ARROW_DEFAULT_MEMORY_POOL:-jemalloc}"
+# Put final/ on the path so sitecustomize.py is picked up at startup
+export PYTHONPATH="final${PYTHONPATH:+:$PYTHONPATH}"
+
+exec streamlit run final/main_pro.py "$@"
@@ -1,5 +1,4 @@
 from pydantic import BaseModel, Field, EmailStr
-from langchain_google_genai import ChatGoogleGenerativeAI
 
 class TechnicalSkill(BaseModel):
     """